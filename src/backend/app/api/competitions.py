@@ -1,14 +1,18 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional, Dict, Any, Union
 from app.services.statsbomb import StatsBombService
+from app.services.upstream import UpstreamUnavailable
 from app.models.competition import Competition, Season, FlatCompetition
 from app.models.match import Match
 
 router = APIRouter(prefix="/competitions", tags=["competitions"])
 statsbomb_service = StatsBombService()
 
+# Handlers are plain functions so FastAPI runs them in its threadpool:
+# the service blocks on upstream I/O and must not stall the event loop
+
 @router.get("/")
-async def get_competitions(
+def get_competitions(
     grouped: bool = Query(False, description="Group seasons by competition (default: false)")
 ):
     """
@@ -56,11 +60,13 @@ async def get_competitions(
                 competitions.append(competition)
             
             return competitions
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/seasons", response_model=List[Season])
-async def get_seasons(
+def get_seasons(
     competition_id: int = Query(..., description="Competition ID to filter seasons")
 ):
     """
@@ -86,11 +92,13 @@ async def get_seasons(
         return target_competition.get('seasons', [])
     except HTTPException:
         raise
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{competition_id}/seasons/{season_id}/matches", response_model=List[Match])
-async def get_matches_by_competition_season(
+def get_matches_by_competition_season(
     competition_id: int,
     season_id: int,
     round: Optional[str] = Query(None, description="Filter by round"),
@@ -109,5 +117,7 @@ async def get_matches_by_competition_season(
             matches = matches[:limit]
             
         return matches
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import List, Optional
 from app.services.statsbomb import StatsBombService
+from app.services.upstream import UpstreamUnavailable
 from app.models.match import Match, MatchDetail
 
 router = APIRouter(prefix="/matches", tags=["matches"])
 statsbomb_service = StatsBombService()
 
+# Handlers are plain functions so FastAPI runs them in its threadpool:
+# the service blocks on upstream I/O and must not stall the event loop
+
 @router.get("/", response_model=List[Match])
-async def get_matches(
+def get_matches(
     competition_id: int = Query(..., description="Competition ID"),
     season_id: int = Query(..., description="Season ID"),
     round: Optional[str] = Query(None, description="Filter by round"),
@@ -26,11 +30,13 @@ async def get_matches(
             matches = matches[:limit]
             
         return matches
+    except UpstreamUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{match_id}", response_model=MatchDetail)
-async def get_match_detail(match_id: int):
+def get_match_detail(match_id: int):
     """Get detailed information for a specific match"""
     try:
         match_detail = statsbomb_service.get_match_detail(match_id)
@@ -40,6 +46,9 @@ async def get_match_detail(match_id: int):
     except HTTPException:
         # Re-raise HTTP exceptions (like 404) without wrapping them
         raise
+    except UpstreamUnavailable as e:
+        # Upstream is degraded and nothing is cached - this is not a missing match
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         # For other exceptions, return 500
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from app.services.statsbomb import StatsBombService
+from app.services.team_index import TeamIndex
+from app.models.team import HeadToHead, HeadToHeadBatchRequest, HeadToHeadSummary, TeamForm
+
+router = APIRouter(prefix="/teams", tags=["teams"])
+statsbomb_service = StatsBombService()
+
+def _team_ids(index: Optional[TeamIndex], *names: str) -> List[int]:
+    """Resolve team names to index ids, raising 404 for names not in any cached season"""
+    ids = [index.team_id(name) if index is not None else None for name in names]
+    missing = sorted({name for name, team_id in zip(names, ids) if team_id is None})
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Teams not found in cached seasons: {', '.join(missing)}"
+        )
+    return ids
+
+def _check_pair(team_a: str, team_b: str) -> None:
+    """A team has no head-to-head record with itself"""
+    if team_a == team_b:
+        raise HTTPException(status_code=400, detail=f"Cannot compare {team_a} with itself")
+
+# Handlers are plain functions so FastAPI runs them in its threadpool:
+# reading snapshots and building or querying the team index must not stall the event loop
+@router.get("/", response_model=List[str])
+def get_teams():
+    """Get the names of all teams in the cached seasons"""
+    try:
+        index = statsbomb_service.get_team_index()
+        return index.teams() if index is not None else []
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/head-to-head", response_model=HeadToHead)
+def get_head_to_head(
+    team_a: str = Query(..., description="First team name"),
+    team_b: str = Query(..., description="Second team name"),
+    competition_id: Optional[int] = Query(None, description="Only count matches in this competition"),
+    season_id: Optional[int] = Query(None, description="Only count matches in this season")
+):
+    """
+    Get the head-to-head record between two teams across all cached seasons.
+    Seasons are cached once their matches have been requested.
+    """
+    try:
+        _check_pair(team_a, team_b)
+        index = statsbomb_service.get_team_index()
+        id_a, id_b = _team_ids(index, team_a, team_b)
+        ranks = index.meetings(id_a, id_b, competition_id, season_id)
+        summary = index.head_to_head(id_a, id_b, ranks)
+        return HeadToHead(**summary.dict(), matches=index.matches(ranks))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/head-to-head", response_model=List[HeadToHeadSummary])
+def get_head_to_head_batch(
+    request: HeadToHeadBatchRequest,
+    competition_id: Optional[int] = Query(None, description="Only count matches in this competition"),
+    season_id: Optional[int] = Query(None, description="Only count matches in this season")
+):
+    """Get head-to-head summaries for many team pairs in one request"""
+    try:
+        for pair in request.pairs:
+            _check_pair(pair.team_a, pair.team_b)
+        index = statsbomb_service.get_team_index()
+        ids = _team_ids(index, *[name for pair in request.pairs for name in (pair.team_a, pair.team_b)])
+        results = []
+        for id_a, id_b in zip(ids[::2], ids[1::2]):
+            ranks = index.meetings(id_a, id_b, competition_id, season_id)
+            results.append(index.head_to_head(id_a, id_b, ranks))
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{team_name}/form", response_model=TeamForm)
+def get_team_form(
+    team_name: str,
+    window: int = Query(5, ge=1, description="Number of matches in the rolling window"),
+    competition_id: Optional[int] = Query(None, description="Only include matches in this competition"),
+    season_id: Optional[int] = Query(None, description="Only include matches in this season"),
+    limit: Optional[int] = Query(None, description="Only return the most recent matches")
+):
+    """Get a team's results with rolling points and goals across all cached seasons"""
+    try:
+        index = statsbomb_service.get_team_index()
+        (team_id,) = _team_ids(index, team_name)
+        ranks = index.history(team_id, competition_id, season_id)
+        # The limit is applied after the rolling totals so they still cover earlier matches
+        entries = index.form(team_id, ranks, window, limit if limit and limit > 0 else None)
+        return TeamForm(team=team_name, window=window, matches=entries)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydantic import BaseSettings
 from dotenv import load_dotenv
 
@@ -15,7 +16,23 @@ class Settings(BaseSettings):
     STATSBOMB_USE_PRIVATE_API: bool = False
     STATSBOMB_API_KEY: str = os.getenv("STATSBOMB_API_KEY", "")
     STATSBOMB_API_URL: str = os.getenv("STATSBOMB_API_URL", "")
-    
+    STATSBOMB_OPEN_DATA_URL: str = "https://raw.githubusercontent.com/statsbomb/open-data/master/data"
+
+    # Upstream client configuration (timeouts are in seconds)
+    UPSTREAM_POOL_SIZE: int = 10
+    UPSTREAM_CONNECT_TIMEOUT: float = 3.05
+    UPSTREAM_READ_TIMEOUT: float = 10.0
+    UPSTREAM_TOTAL_TIMEOUT: float = 15.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_BACKOFF_BASE: float = 0.2
+    UPSTREAM_BACKOFF_MAX: float = 2.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_TIMEOUT: float = 30.0
+
+    # Shared snapshot cache, memory-mapped by every worker on the host
+    SNAPSHOT_DIR: str = os.path.join(tempfile.gettempdir(), "estilo-futbol-snapshots")
+    SNAPSHOT_TTL: float = 86400.0
+
     # CORS settings
     BACKEND_CORS_ORIGINS: list = ["*"]
     
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import matches, competitions
+from app.api import matches, competitions, teams
 from app.config import settings
 
 app = FastAPI(
@@ -21,6 +21,7 @@ app.add_middleware(
 # Include routers
 app.include_router(matches.router, prefix="/api")
 app.include_router(competitions.router, prefix="/api")
+app.include_router(teams.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import date
+from app.models.match import Match
+
+class HeadToHeadSummary(BaseModel):
+    """Aggregate record between two teams"""
+    team_a: str
+    team_b: str
+    played: int
+    team_a_wins: int
+    team_b_wins: int
+    draws: int
+    team_a_goals: int
+    team_b_goals: int
+
+class HeadToHead(HeadToHeadSummary):
+    """Head-to-head record including the matches it was computed from"""
+    matches: List[Match] = Field(default_factory=list, description="Matches between the two teams, oldest first")
+
+class TeamPair(BaseModel):
+    """A pair of teams to compare"""
+    team_a: str
+    team_b: str
+
+class HeadToHeadBatchRequest(BaseModel):
+    """Batch of team pairs for head-to-head lookup"""
+    pairs: List[TeamPair] = Field(..., max_items=10000, description="Team pairs to compare")
+
+class FormEntry(BaseModel):
+    """One match in a team's form guide with rolling totals up to and including it"""
+    match_id: int
+    match_date: date
+    competition_id: int
+    season_id: int
+    opponent: str
+    home: bool
+    goals_for: int
+    goals_against: int
+    result: str = Field(..., description="W, D or L")
+    points: int
+    rolling_points: int
+    rolling_goals_for: int
+    rolling_goals_against: int
+
+class TeamForm(BaseModel):
+    """Rolling form for a team"""
+    team: str
+    window: int
+    matches: List[FormEntry] = Field(default_factory=list, description="Matches, oldest first")
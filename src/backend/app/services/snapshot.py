@@ -0,0 +1,237 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishing still works, just without the writer lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# File layout (all little-endian):
+#   header       magic, layout version, data version, created_at, string count,
+#                string blob size, row count, row size
+#   offsets      uint32[string count + 1] into the string blob
+#   blob         UTF-8 string data, zero-padded to an 8-byte boundary
+#   rows         fixed-size records described by a numpy structured dtype
+MAGIC = b"EFSNAP\x00\x00"
+LAYOUT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQdQQQQ")
+
+# Row layouts. String columns hold indices into the snapshot's string table.
+COMPETITION_DTYPE = np.dtype([
+    ('competition_id', '<i4'),
+    ('season_id', '<i4'),
+    ('competition_name', '<u4'),
+    ('season_name', '<u4'),
+    ('country_name', '<u4'),
+])
+
+MATCH_DTYPE = np.dtype([
+    ('match_id', '<i8'),
+    ('fetched_at', '<i8'),       # unix seconds when the season was fetched
+    ('competition_id', '<i4'),
+    ('season_id', '<i4'),
+    ('match_date', '<i4'),       # days since 1970-01-01
+    ('match_round', '<u4'),
+    ('home_team', '<u4'),
+    ('away_team', '<u4'),
+    ('home_score', '<i2'),
+    ('away_score', '<i2'),
+])
+
+
+# Match dates are stored as days since the unix epoch
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _pad8(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class StringTable:
+    """Interns strings while building a snapshot"""
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+        for value in strings:
+            self.add(value)
+
+    def add(self, value: Optional[str]) -> int:
+        value = value or ''
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a published snapshot file"""
+
+    def __init__(self, buffer: mmap.mmap, dtype: np.dtype, path: str):
+        magic, layout, _, version, created_at, string_count, blob_size, row_count, row_size = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION or row_size != dtype.itemsize:
+            raise ValueError(f"{path} is not a compatible snapshot file")
+
+        self.path = path
+        self.version = version
+        self.created_at = created_at
+        self._buffer = buffer
+
+        offset = _HEADER.size
+        self._offsets = np.frombuffer(buffer, dtype='<u4', count=string_count + 1, offset=offset)
+        offset += _pad8(self._offsets.nbytes)
+        self._blob_offset = offset
+        offset += _pad8(blob_size)
+        # Zero-copy: rows are read straight out of the shared page cache
+        self.rows = np.frombuffer(buffer, dtype=dtype, count=row_count, offset=offset)
+        self._strings: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def string_count(self) -> int:
+        return len(self._offsets) - 1
+
+    def string(self, index: int) -> str:
+        """Decode a string table entry"""
+        value = self._strings.get(index)
+        if value is None:
+            start = self._blob_offset + int(self._offsets[index])
+            end = self._blob_offset + int(self._offsets[index + 1])
+            value = self._strings[index] = self._buffer[start:end].decode('utf-8')
+        return value
+
+    def strings(self) -> List[str]:
+        return [self.string(i) for i in range(self.string_count)]
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class SnapshotStore:
+    """
+    Directory of immutable, versioned snapshot files shared by all workers.
+
+    Each snapshot is published by writing a complete new file and atomically
+    renaming it over the old one, so readers always see either the previous
+    or the next version in full. Readers memory-map the file read-only, which
+    lets every worker on the host share one copy in the page cache; mappings
+    of a replaced file stay valid until the reader picks up the new one.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or settings.SNAPSHOT_DIR
+        self._open: Dict[str, Tuple[Tuple[int, int, int], Snapshot]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.snap")
+
+    def get(self, name: str, dtype: np.dtype) -> Optional[Snapshot]:
+        """Return the current snapshot, remapping if a new version was published"""
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            current = self._open.get(name)
+            if current is not None and current[0] == identity:
+                return current[1]
+            try:
+                snapshot = self._map(path, dtype)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+                return None
+            self._open[name] = (identity, snapshot)
+            return snapshot
+
+    def publish(
+        self,
+        name: str,
+        dtype: np.dtype,
+        build: Callable[[Optional[Snapshot]], Tuple[np.ndarray, List[str]]],
+    ) -> None:
+        """
+        Write a new version of a snapshot and atomically swap it in.
+
+        `build` receives the current snapshot (or None) and returns the rows
+        and string table of the new version. Writers are serialised across
+        processes so read-modify-write updates do not lose each other.
+        """
+        with self._writer_lock(name):
+            current = self.get(name, dtype)
+            rows, strings = build(current)
+            version = current.version + 1 if current is not None else 1
+            self._write(name, dtype, version, rows, strings)
+
+    @contextmanager
+    def _writer_lock(self, name: str):
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, f"{name}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, name: str, dtype: np.dtype, version: int, rows: np.ndarray, strings: List[str]) -> None:
+        rows = np.ascontiguousarray(rows, dtype=dtype)
+        encoded = [value.encode('utf-8') for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+        if encoded:
+            offsets[1:] = np.cumsum([len(value) for value in encoded])
+        blob = b"".join(encoded)
+
+        header = _HEADER.pack(
+            MAGIC, LAYOUT_VERSION, 0, version, time.time(),
+            len(encoded), len(blob), len(rows), dtype.itemsize,
+        )
+
+        path = self.path(name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(offsets.tobytes())
+                f.write(b"\0" * (_pad8(offsets.nbytes) - offsets.nbytes))
+                f.write(blob)
+                f.write(b"\0" * (_pad8(len(blob)) - len(blob)))
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _map(path: str, dtype: np.dtype) -> Snapshot:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return Snapshot(buffer, dtype, path)
+
+
+# Shared store so every service instance reads the same mappings
+snapshot_store = SnapshotStore()
@@ -1,14 +1,32 @@
-from statsbombpy import sb
 from app.models.match import Match, MatchDetail
 from app.config import settings
-from typing import List, Dict, Any, Optional
-import pandas as pd
+from app.services.snapshot import (
+    COMPETITION_DTYPE, EPOCH_ORDINAL, MATCH_DTYPE, Snapshot, SnapshotStore, StringTable, snapshot_store
+)
+from app.services.team_index import TeamIndex
+from app.services.upstream import UpstreamClient, UpstreamNotFound, UpstreamUnavailable, upstream_client
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPETITIONS_SNAPSHOT = "competitions"
+MATCHES_SNAPSHOT = "matches"
 
 class StatsBombService:
     """Service for interacting with StatsBomb data"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[UpstreamClient] = None, snapshots: Optional[SnapshotStore] = None):
         """Initialize the StatsBomb service"""
+        # All instances share the pooled upstream client (and its circuit breaker) by default
+        self.client = client or upstream_client
+        # Competitions and season matches are shared with other workers through snapshot files
+        self.snapshots = snapshots or snapshot_store
+        self._team_index: Optional[TeamIndex] = None
+        
         # If using private API, configure credentials
         if settings.STATSBOMB_USE_PRIVATE_API:
             # This would be implemented when switching to private API
@@ -16,134 +34,266 @@ class StatsBombService:
     
     def get_competitions(self) -> List[Dict[str, Any]]:
         """Get available competitions with their seasons"""
-        competitions_df = sb.competitions()
+        snapshot = self.snapshots.get(COMPETITIONS_SNAPSHOT, COMPETITION_DTYPE)
+        if snapshot is not None and snapshot.age() < settings.SNAPSHOT_TTL:
+            return self._competitions_from_snapshot(snapshot)
+        
+        try:
+            rows = self.client.get_json("competitions.json")
+        except UpstreamUnavailable:
+            # A stale snapshot is better than no answer
+            if snapshot is not None:
+                return self._competitions_from_snapshot(snapshot)
+            raise
         
-        # Group by competition and collect seasons
-        result = []
-        for comp_id in competitions_df['competition_id'].unique():
-            comp_data = competitions_df[competitions_df['competition_id'] == comp_id].iloc[0]
-            
-            # Get all seasons for this competition
-            seasons = []
-            for _, season_row in competitions_df[competitions_df['competition_id'] == comp_id].iterrows():
-                seasons.append({
-                    'season_id': season_row.get('season_id'),
-                    'season_name': season_row.get('season_name')
-                })
-            
-            # Create competition entry with seasons
-            competition = {
-                'competition_id': comp_id,
-                'competition_name': comp_data.get('competition_name'),
-                'country_name': comp_data.get('country_name'),
-                'seasons': seasons
-            }
-            
-            result.append(competition)
-            
+        # Group by competition (in order of first appearance) and collect seasons
+        competitions: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            comp_id = row.get('competition_id')
+            if comp_id not in competitions:
+                competitions[comp_id] = {
+                    'competition_id': comp_id,
+                    'competition_name': row.get('competition_name'),
+                    'country_name': row.get('country_name'),
+                    'seasons': []
+                }
+            competitions[comp_id]['seasons'].append({
+                'season_id': row.get('season_id'),
+                'season_name': row.get('season_name')
+            })
+        
+        result = list(competitions.values())
+        self._publish(COMPETITIONS_SNAPSHOT, COMPETITION_DTYPE, lambda current: self._encode_competitions(result))
         return result
     
     def get_matches(self, competition_id: int, season_id: int) -> List[Match]:
         """Get matches for a specific competition and season"""
-        matches_df = sb.matches(competition_id=competition_id, season_id=season_id)
+        snapshot = self.snapshots.get(MATCHES_SNAPSHOT, MATCH_DTYPE)
+        season_rows = self._season_rows(snapshot, competition_id, season_id) if snapshot is not None else None
+        has_season = season_rows is not None and len(season_rows) > 0
+        if has_season and time.time() - int(season_rows['fetched_at'][0]) < settings.SNAPSHOT_TTL:
+            return self._matches_from_snapshot(snapshot, season_rows)
         
-        # Convert DataFrame to list of Match objects
-        matches = []
-        for _, row in matches_df.iterrows():
-            match = Match(
-                match_id=row.get('match_id'),
-                match_date=row.get('match_date'),
-                match_round=row.get('match_round', ''),
-                home_team=row.get('home_team'),
-                away_team=row.get('away_team'),
-                home_score=row.get('home_score'),
-                away_score=row.get('away_score'),
-                competition_id=competition_id,
-                season_id=season_id
-            )
-            matches.append(match)
+        try:
+            rows = self._get_match_rows(competition_id, season_id)
+        except UpstreamUnavailable:
+            if has_season:
+                return self._matches_from_snapshot(snapshot, season_rows)
+            raise
         
+        matches = [
+            Match(**self._match_fields(row), competition_id=competition_id, season_id=season_id)
+            for row in rows
+        ]
+        if matches:
+            self._publish(
+                MATCHES_SNAPSHOT, MATCH_DTYPE,
+                lambda current: self._encode_season(current, competition_id, season_id, matches)
+            )
         return matches
     
+    def get_team_index(self) -> Optional[TeamIndex]:
+        """
+        Team index over every season in the shared match snapshot, or None if
+        no season has been cached yet. Rebuilt when a new snapshot is published.
+        """
+        snapshot = self.snapshots.get(MATCHES_SNAPSHOT, MATCH_DTYPE)
+        if snapshot is None:
+            return None
+        index = self._team_index
+        if index is None or index.snapshot is not snapshot:
+            index = self._team_index = TeamIndex(snapshot)
+        return index
+    
     def get_match_detail(self, match_id: int) -> Optional[MatchDetail]:
-        """Get detailed information for a specific match"""
+        """
+        Get detailed information for a specific match.
+        
+        Returns None when the match does not exist. Upstream failures are not
+        swallowed: UpstreamUnavailable propagates so the API can answer 503.
+        """
         try:
-            # The statsbombpy library doesn't support fetching matches by match_id directly
-            # Instead, we need to try to fetch events for the match_id to see if it exists
-            try:
-                # Try to get events for the match to check if it exists
-                events_df = sb.events(match_id=match_id)
-                if events_df.empty:
-                    return None
-            except Exception as e:
-                # If there's an error fetching events, the match likely doesn't exist
-                print(f"Match not found: {e}")
-                # Return None to indicate match not found (will be converted to 404 in the API layer)
-                return None
-                
-            # Since we can't get match details directly by match_id, we need to find the match
-            # in all competitions to get its details
-            # This is a simplified approach - in a production environment, you might want to
-            # cache competition/match data to avoid fetching all competitions each time
-            
-            # Get all competitions
-            competitions = self.get_competitions()
-            
-            # Initialize variables to store match information
-            match_data = None
-            competition_id = None
-            season_id = None
-            
-            # Search for the match in all competitions
-            for comp in competitions:
-                try:
-                    comp_id = comp.get('competition_id')
-                    seasons = comp.get('seasons', [])
-                    
-                    for season in seasons:
-                        try:
-                            season_id = season.get('season_id')
-                            matches_df = sb.matches(competition_id=comp_id, season_id=season_id)
-                            
-                            # Check if the match is in this competition/season
-                            match_found = matches_df[matches_df['match_id'] == match_id]
-                            
-                            if not match_found.empty:
-                                match_data = match_found.iloc[0]
-                                competition_id = comp_id
-                                season_id = season_id
-                                break
-                        except Exception:
-                            continue
-                    
-                    if match_data is not None:
-                        break
-                except Exception:
-                    continue
-            
-            # If we couldn't find the match in any competition, return None
-            if match_data is None:
-                return None
-            
-            # Create MatchDetail object
-            match_detail = MatchDetail(
+            events = self.client.get_json(f"events/{match_id}.json")
+        except UpstreamNotFound:
+            return None
+        if not events:
+            return None
+        
+        # The open data has no lookup by match_id, so find the match in the
+        # season match lists
+        located = self._find_match(match_id)
+        if located is None:
+            return None
+        match_data, competition_id, season_id = located
+        
+        stadium = match_data.get('stadium')
+        referee = match_data.get('referee')
+        return MatchDetail(
+            **self._match_fields(match_data),
+            competition_id=competition_id,
+            season_id=season_id,
+            stadium=stadium.get('name', '') if isinstance(stadium, dict) else '',
+            referee=referee.get('name', '') if isinstance(referee, dict) else '',
+            events_count=len(events),
+            # Additional statistics could be calculated here
+        )
+    
+    def _get_match_rows(self, competition_id: int, season_id: int) -> List[Dict[str, Any]]:
+        """Raw match rows for a competition/season; an unknown season has no matches"""
+        try:
+            return self.client.get_json(f"matches/{competition_id}/{season_id}.json")
+        except UpstreamNotFound:
+            return []
+    
+    def _find_match(self, match_id: int) -> Optional[Tuple[Dict[str, Any], int, int]]:
+        """Locate a match row and its competition/season across all seasons"""
+        located = self._locate_match(match_id)
+        if located is None:
+            return None
+        comp_id, season_id = located
+        
+        # Stadium and referee are not kept in the snapshot, so read that one season's raw rows
+        for row in self._get_match_rows(comp_id, season_id):
+            if row.get('match_id') == match_id:
+                return row, comp_id, season_id
+        return None
+    
+    def _locate_match(self, match_id: int) -> Optional[Tuple[int, int]]:
+        """Find the competition/season a match belongs to"""
+        # Seasons already in the shared snapshot tell us where to look directly
+        snapshot = self.snapshots.get(MATCHES_SNAPSHOT, MATCH_DTYPE)
+        if snapshot is not None:
+            hits = np.flatnonzero(snapshot.rows['match_id'] == match_id)
+            if len(hits):
+                return int(snapshot.rows['competition_id'][hits[0]]), int(snapshot.rows['season_id'][hits[0]])
+        
+        # Otherwise walk the seasons; get_matches publishes each one to the snapshot,
+        # so this scan only has to go upstream once per season
+        for comp in self.get_competitions():
+            comp_id = comp['competition_id']
+            for season in comp.get('seasons', []):
+                season_id = season['season_id']
+                if any(match.match_id == match_id for match in self.get_matches(comp_id, season_id)):
+                    return comp_id, season_id
+        return None
+    
+    def _publish(self, name: str, dtype: np.dtype, build) -> None:
+        """Publish a snapshot; failing to share data must not fail the request"""
+        try:
+            self.snapshots.publish(name, dtype, build)
+        except OSError as e:
+            logger.warning("Could not publish %s snapshot: %s", name, e)
+    
+    @staticmethod
+    def _encode_competitions(competitions: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[str]]:
+        """Flatten grouped competitions into snapshot rows, one per season"""
+        table = StringTable()
+        flat = [(comp, season) for comp in competitions for season in comp.get('seasons', [])]
+        rows = np.zeros(len(flat), dtype=COMPETITION_DTYPE)
+        for i, (comp, season) in enumerate(flat):
+            rows[i] = (
+                comp['competition_id'],
+                season['season_id'],
+                table.add(comp.get('competition_name')),
+                table.add(season.get('season_name')),
+                table.add(comp.get('country_name')),
+            )
+        return rows, table.strings
+    
+    @staticmethod
+    def _competitions_from_snapshot(snapshot: Snapshot) -> List[Dict[str, Any]]:
+        rows = snapshot.rows
+        competitions: Dict[int, Dict[str, Any]] = {}
+        for comp_id, season_id, comp_name, season_name, country in zip(
+            rows['competition_id'].tolist(), rows['season_id'].tolist(), rows['competition_name'].tolist(),
+            rows['season_name'].tolist(), rows['country_name'].tolist()
+        ):
+            if comp_id not in competitions:
+                competitions[comp_id] = {
+                    'competition_id': comp_id,
+                    'competition_name': snapshot.string(comp_name),
+                    'country_name': snapshot.string(country),
+                    'seasons': []
+                }
+            competitions[comp_id]['seasons'].append({
+                'season_id': season_id,
+                'season_name': snapshot.string(season_name)
+            })
+        return list(competitions.values())
+    
+    @staticmethod
+    def _season_rows(snapshot: Snapshot, competition_id: int, season_id: int) -> np.ndarray:
+        rows = snapshot.rows
+        return rows[(rows['competition_id'] == competition_id) & (rows['season_id'] == season_id)]
+    
+    @staticmethod
+    def _encode_season(
+        current: Optional[Snapshot], competition_id: int, season_id: int, matches: List[Match]
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Replace one season's rows in the match snapshot, keeping every other season"""
+        if current is not None:
+            # Re-adding the existing strings in order keeps their indices unchanged
+            table = StringTable(current.strings())
+            rows = current.rows
+            kept = rows[~((rows['competition_id'] == competition_id) & (rows['season_id'] == season_id))]
+        else:
+            table = StringTable()
+            kept = np.zeros(0, dtype=MATCH_DTYPE)
+        
+        fetched_at = int(time.time())
+        new = np.zeros(len(matches), dtype=MATCH_DTYPE)
+        for i, match in enumerate(matches):
+            new[i] = (
+                match.match_id,
+                fetched_at,
+                competition_id,
+                season_id,
+                match.match_date.toordinal() - EPOCH_ORDINAL,
+                table.add(match.match_round),
+                table.add(match.home_team),
+                table.add(match.away_team),
+                match.home_score,
+                match.away_score,
+            )
+        
+        combined = np.concatenate([kept, new])
+        # Keep each season contiguous; lexsort is stable so match order is preserved
+        order = np.lexsort((combined['season_id'], combined['competition_id']))
+        return combined[order], table.strings
+    
+    @staticmethod
+    def _matches_from_snapshot(snapshot: Snapshot, rows: np.ndarray) -> List[Match]:
+        return [
+            Match(
                 match_id=match_id,
-                match_date=match_data.get('match_date'),
-                match_round=match_data.get('match_round', ''),
-                home_team=match_data.get('home_team'),
-                away_team=match_data.get('away_team'),
-                home_score=match_data.get('home_score'),
-                away_score=match_data.get('away_score'),
+                match_date=date.fromordinal(EPOCH_ORDINAL + match_date),
+                match_round=snapshot.string(match_round),
+                home_team=snapshot.string(home_team),
+                away_team=snapshot.string(away_team),
+                home_score=home_score,
+                away_score=away_score,
                 competition_id=competition_id,
-                season_id=season_id,
-                stadium=match_data.get('stadium', {}).get('name', '') if isinstance(match_data.get('stadium'), dict) else '',
-                referee=match_data.get('referee', {}).get('name', '') if isinstance(match_data.get('referee'), dict) else '',
-                events_count=len(events_df) if not events_df.empty else 0,
-                # Additional statistics could be calculated here
+                season_id=season_id
             )
-            
-            return match_detail
-            
-        except Exception as e:
-            print(f"Error fetching match detail: {e}")
-            return None
\ No newline at end of file
+            for match_id, match_date, match_round, home_team, away_team, home_score, away_score,
+            competition_id, season_id in zip(
+                rows['match_id'].tolist(), rows['match_date'].tolist(), rows['match_round'].tolist(),
+                rows['home_team'].tolist(), rows['away_team'].tolist(), rows['home_score'].tolist(),
+                rows['away_score'].tolist(), rows['competition_id'].tolist(), rows['season_id'].tolist()
+            )
+        ]
+    
+    @staticmethod
+    def _match_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a raw open-data match row onto the basic Match fields"""
+        home_team = row.get('home_team')
+        away_team = row.get('away_team')
+        return {
+            'match_id': row.get('match_id'),
+            'match_date': row.get('match_date'),
+            'match_round': row.get('match_round', ''),
+            'home_team': home_team.get('home_team_name') if isinstance(home_team, dict) else home_team,
+            'away_team': away_team.get('away_team_name') if isinstance(away_team, dict) else away_team,
+            'home_score': row.get('home_score'),
+            'away_score': row.get('away_score'),
+        }
@@ -0,0 +1,177 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.match import Match
+from app.models.team import FormEntry, HeadToHeadSummary
+from app.services.snapshot import EPOCH_ORDINAL, Snapshot
+
+RESULTS = np.array(['L', 'D', 'W'])
+
+
+class TeamIndex:
+    """
+    Inverted index from team to matches over a match snapshot.
+
+    Matches are numbered by chronological rank (date, then match_id). Each
+    team's posting list is a sorted array of ranks stored back to back in one
+    CSR-style array, so a team's history is a slice and a head-to-head record
+    is the intersection of two sorted arrays. Team ids are the snapshot's
+    string table indices. The index is immutable and built once per snapshot
+    version.
+    """
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+        rows = snapshot.rows
+
+        # Columns in chronological order; rank i is self.<column>[i]
+        by_date = np.lexsort((rows['match_id'], rows['match_date']))
+        self.match_id = rows['match_id'][by_date]
+        self.match_date = rows['match_date'][by_date]
+        self.competition_id = rows['competition_id'][by_date]
+        self.season_id = rows['season_id'][by_date]
+        self.home_team = rows['home_team'][by_date].astype(np.int64)
+        self.away_team = rows['away_team'][by_date].astype(np.int64)
+        self.home_score = rows['home_score'][by_date].astype(np.int64)
+        self.away_score = rows['away_score'][by_date].astype(np.int64)
+        self.match_round = rows['match_round'][by_date]
+
+        ranks = np.arange(len(rows), dtype=np.int32)
+        teams = np.concatenate([self.home_team, self.away_team])
+        order = np.lexsort((np.concatenate([ranks, ranks]), teams))
+        self._postings = np.concatenate([ranks, ranks])[order]
+        counts = np.bincount(teams, minlength=snapshot.string_count)
+        self._indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._indptr[1:])
+        self._team_ids: Dict[str, int] = {snapshot.string(int(t)): int(t) for t in np.flatnonzero(counts)}
+
+    def teams(self) -> List[str]:
+        return sorted(self._team_ids)
+
+    def team_id(self, name: str) -> Optional[int]:
+        return self._team_ids.get(name)
+
+    def history(self, team_id: int, competition_id: Optional[int] = None,
+                season_id: Optional[int] = None) -> np.ndarray:
+        """Sorted ranks of every match the team played"""
+        ranks = self._postings[self._indptr[team_id]:self._indptr[team_id + 1]]
+        return self._filter(ranks, competition_id, season_id)
+
+    def meetings(self, team_a: int, team_b: int, competition_id: Optional[int] = None,
+                 season_id: Optional[int] = None) -> np.ndarray:
+        """Sorted ranks of the matches between two teams"""
+        a = self._postings[self._indptr[team_a]:self._indptr[team_a + 1]]
+        b = self._postings[self._indptr[team_b]:self._indptr[team_b + 1]]
+        # Probe the longer sorted list with the shorter one
+        short, long = (a, b) if len(a) <= len(b) else (b, a)
+        if len(long) == 0:
+            return long
+        positions = np.minimum(np.searchsorted(long, short), len(long) - 1)
+        ranks = short[long[positions] == short]
+        return self._filter(ranks, competition_id, season_id)
+
+    def head_to_head(self, team_a: int, team_b: int, ranks: np.ndarray) -> HeadToHeadSummary:
+        """Aggregate a head-to-head record over the given meetings"""
+        goals_a, goals_b = self._goals(team_a, ranks)
+        return HeadToHeadSummary(
+            team_a=self.snapshot.string(team_a),
+            team_b=self.snapshot.string(team_b),
+            played=len(ranks),
+            team_a_wins=int(np.count_nonzero(goals_a > goals_b)),
+            team_b_wins=int(np.count_nonzero(goals_a < goals_b)),
+            draws=int(np.count_nonzero(goals_a == goals_b)),
+            team_a_goals=int(goals_a.sum()),
+            team_b_goals=int(goals_b.sum()),
+        )
+
+    def form(self, team_id: int, ranks: np.ndarray, window: int,
+             limit: Optional[int] = None) -> List[FormEntry]:
+        """
+        Per-match results with rolling totals over the last `window` matches.
+        With `limit`, only the most recent entries are returned; their rolling
+        totals still include the earlier matches.
+        """
+        goals_for, goals_against = self._goals(team_id, ranks)
+        outcome = np.sign(goals_for - goals_against) + 1  # 0 loss, 1 draw, 2 win
+        points = np.array([0, 1, 3])[outcome]
+
+        # Rolling sums as differences of prefix sums; early entries use a partial window
+        end = np.arange(1, len(ranks) + 1)
+        start = np.maximum(end - window, 0)
+
+        def rolling(values):
+            prefix = np.concatenate([[0], np.cumsum(values)])
+            return prefix[end] - prefix[start]
+
+        rolling_points = rolling(points)
+        rolling_for = rolling(goals_for)
+        rolling_against = rolling(goals_against)
+
+        if limit:
+            tail = slice(max(len(ranks) - limit, 0), None)
+            ranks, goals_for, goals_against, outcome, points = \
+                ranks[tail], goals_for[tail], goals_against[tail], outcome[tail], points[tail]
+            rolling_points, rolling_for, rolling_against = \
+                rolling_points[tail], rolling_for[tail], rolling_against[tail]
+
+        home = self.home_team[ranks] == team_id
+        opponents = np.where(home, self.away_team[ranks], self.home_team[ranks])
+        string = self.snapshot.string
+        return [
+            FormEntry(
+                match_id=match_id,
+                match_date=date.fromordinal(EPOCH_ORDINAL + match_date),
+                competition_id=competition_id,
+                season_id=season_id,
+                opponent=string(opponent),
+                home=is_home,
+                goals_for=gf,
+                goals_against=ga,
+                result=result,
+                points=pts,
+                rolling_points=r_pts,
+                rolling_goals_for=r_gf,
+                rolling_goals_against=r_ga,
+            )
+            for match_id, match_date, competition_id, season_id, opponent, is_home, gf, ga, result, pts,
+            r_pts, r_gf, r_ga in zip(
+                self.match_id[ranks].tolist(), self.match_date[ranks].tolist(),
+                self.competition_id[ranks].tolist(), self.season_id[ranks].tolist(), opponents.tolist(),
+                home.tolist(), goals_for.tolist(), goals_against.tolist(), RESULTS[outcome].tolist(),
+                points.tolist(), rolling_points.tolist(), rolling_for.tolist(), rolling_against.tolist()
+            )
+        ]
+
+    def matches(self, ranks: np.ndarray) -> List[Match]:
+        string = self.snapshot.string
+        return [
+            Match(
+                match_id=int(self.match_id[rank]),
+                match_date=date.fromordinal(EPOCH_ORDINAL + int(self.match_date[rank])),
+                match_round=string(int(self.match_round[rank])),
+                home_team=string(int(self.home_team[rank])),
+                away_team=string(int(self.away_team[rank])),
+                home_score=int(self.home_score[rank]),
+                away_score=int(self.away_score[rank]),
+                competition_id=int(self.competition_id[rank]),
+                season_id=int(self.season_id[rank]),
+            )
+            for rank in ranks.tolist()
+        ]
+
+    def _goals(self, team_id: int, ranks: np.ndarray):
+        """Goals scored and conceded by a team in each of the given matches"""
+        home = self.home_team[ranks] == team_id
+        home_score = self.home_score[ranks]
+        away_score = self.away_score[ranks]
+        return np.where(home, home_score, away_score), np.where(home, away_score, home_score)
+
+    def _filter(self, ranks: np.ndarray, competition_id: Optional[int],
+                season_id: Optional[int]) -> np.ndarray:
+        if competition_id is not None:
+            ranks = ranks[self.competition_id[ranks] == competition_id]
+        if season_id is not None:
+            ranks = ranks[self.season_id[ranks] == season_id]
+        return ranks
@@ -0,0 +1,240 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Status codes that indicate a transient upstream problem worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Bodies are read in pieces of at most this size so the deadline can be checked between them
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class UpstreamError(Exception):
+    """Base error for failures talking to the upstream data host"""
+
+
+class UpstreamNotFound(UpstreamError):
+    """The requested resource does not exist upstream (HTTP 404)"""
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Upstream is degraded: retries were exhausted or the circuit is open"""
+
+
+class _BodyDeadlineExceeded(Exception):
+    """The response body did not arrive before the call's overall deadline"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected without touching the network. Once `reset_timeout` seconds
+    have passed a single probe request is let through (half-open); its outcome
+    either closes the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.CIRCUIT_RESET_TIMEOUT
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be made to upstream right now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            # Half-open: only one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Upstream circuit opened after %d consecutive failures", self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """
+    HTTP client for the StatsBomb data host.
+
+    Uses a pooled keep-alive session, bounds every call with connect/read
+    timeouts and an overall deadline, retries transient failures with
+    jittered exponential backoff, and stops calling a failing host through a
+    circuit breaker. It keeps no copies of documents: callers fall back to
+    the shared snapshots when upstream is degraded.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        def _pick(value, default):
+            return default if value is None else value
+
+        self.base_url = _pick(base_url, settings.STATSBOMB_OPEN_DATA_URL).rstrip("/")
+        self.connect_timeout = _pick(connect_timeout, settings.UPSTREAM_CONNECT_TIMEOUT)
+        self.read_timeout = _pick(read_timeout, settings.UPSTREAM_READ_TIMEOUT)
+        self.total_timeout = _pick(total_timeout, settings.UPSTREAM_TOTAL_TIMEOUT)
+        self.max_retries = _pick(max_retries, settings.UPSTREAM_MAX_RETRIES)
+        self.backoff_base = _pick(backoff_base, settings.UPSTREAM_BACKOFF_BASE)
+        self.backoff_max = _pick(backoff_max, settings.UPSTREAM_BACKOFF_MAX)
+        self.breaker = breaker or CircuitBreaker()
+
+        pool_size = _pick(pool_size, settings.UPSTREAM_POOL_SIZE)
+        self.session = requests.Session()
+        # Retries are handled here so that they respect the overall deadline
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_json(self, path: str) -> Any:
+        """
+        Fetch and decode a JSON document relative to the base URL.
+
+        Raises UpstreamNotFound for a 404 and UpstreamUnavailable when
+        retries are exhausted or the circuit is open.
+        """
+        if not self.breaker.allow_request():
+            raise UpstreamUnavailable(f"Circuit open, not calling upstream for {path}")
+
+        # The breaker sees one outcome per call however many attempts it took,
+        # and every way out reports one, so a half-open probe is always released
+        healthy = False
+        try:
+            data = self._fetch_with_retries(path)
+            healthy = True
+            return data
+        except UpstreamUnavailable:
+            raise
+        except UpstreamError:
+            # A 404 or other client error means upstream is answering normally
+            healthy = True
+            raise
+        finally:
+            if healthy:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _fetch_with_retries(self, path: str) -> Any:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        deadline = time.monotonic() + self.total_timeout
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+            try:
+                # Stream the body: requests' read timeout applies per socket read,
+                # so a host trickling bytes would otherwise never be cut off
+                with self.session.get(url, timeout=timeout, stream=True) as response:
+                    status = response.status_code
+                    body = self._read_body(response, deadline) if status < 400 else None
+            except (requests.RequestException, urllib3.exceptions.HTTPError, _BodyDeadlineExceeded) as e:
+                # Connection errors, timeouts, truncated, undecodable or too slow bodies
+                last_error = e
+            else:
+                if status == 404:
+                    raise UpstreamNotFound(f"{path} not found upstream")
+                if status in RETRYABLE_STATUS_CODES:
+                    last_error = UpstreamError(f"Upstream returned {status} for {path}")
+                elif status >= 400:
+                    # Other client errors will not succeed on retry
+                    raise UpstreamError(f"Upstream returned {status} for {path}")
+                else:
+                    try:
+                        return json.loads(body)
+                    except ValueError as e:
+                        last_error = e
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    break
+                time.sleep(delay)
+
+        raise UpstreamUnavailable(f"Upstream request for {path} failed: {last_error}")
+
+    @staticmethod
+    def _read_body(response: requests.Response, deadline: float) -> bytes:
+        """
+        Read a streamed body, giving up once the deadline has passed.
+
+        read1 returns whatever has arrived instead of waiting for a full chunk,
+        so a call overruns its deadline by at most one read timeout.
+        """
+        chunks = []
+        while True:
+            chunk = response.raw.read1(READ_CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+            if time.monotonic() >= deadline:
+                raise _BodyDeadlineExceeded(f"Body of {response.url} still arriving at the deadline")
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+# Shared client so every service instance reuses the same pool and breaker
+upstream_client = UpstreamClient()
@@ -0,0 +1,133 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models.match import Match
+from app.services.snapshot import MATCH_DTYPE, SnapshotStore, StringTable
+from app.services.statsbomb import MATCHES_SNAPSHOT, StatsBombService
+from app.services.upstream import UpstreamUnavailable
+from tests.upstream_stubs import FailingClient, RecordingClient
+
+
+def build_rows(*teams):
+    table = StringTable()
+    rows = np.zeros(len(teams), dtype=MATCH_DTYPE)
+    for i, (home, away) in enumerate(teams):
+        rows[i]['match_id'] = i + 1
+        rows[i]['home_team'] = table.add(home)
+        rows[i]['away_team'] = table.add(away)
+    return rows, table.strings
+
+
+def test_publish_and_read_round_trip(tmp_path):
+    """Published rows and strings are read back through the memory map"""
+    store = SnapshotStore(str(tmp_path))
+    store.publish("test", MATCH_DTYPE, lambda current: build_rows(("Team A", "Team B"), ("Équipe C", "Team A")))
+
+    snapshot = store.get("test", MATCH_DTYPE)
+    assert snapshot.version == 1
+    assert len(snapshot) == 2
+    assert snapshot.rows['match_id'].tolist() == [1, 2]
+    assert snapshot.string(int(snapshot.rows['home_team'][1])) == "Équipe C"
+    assert snapshot.string(int(snapshot.rows['away_team'][1])) == "Team A"
+    assert not snapshot.rows.flags.writeable
+
+
+def test_publish_swaps_atomically(tmp_path):
+    """Readers keep their mapped version; the next get sees the new one"""
+    store = SnapshotStore(str(tmp_path))
+    store.publish("test", MATCH_DTYPE, lambda current: build_rows(("Team A", "Team B")))
+    old = store.get("test", MATCH_DTYPE)
+
+    # A second store stands in for another worker process
+    other_worker = SnapshotStore(str(tmp_path))
+    other_worker.publish("test", MATCH_DTYPE, lambda current: build_rows(("Team C", "Team D"), ("Team E", "Team F")))
+
+    assert len(old) == 1
+    assert old.string(int(old.rows['home_team'][0])) == "Team A"
+
+    new = store.get("test", MATCH_DTYPE)
+    assert new.version == 2
+    assert len(new) == 2
+    assert store.get("test", MATCH_DTYPE) is new
+
+
+def test_get_ignores_missing_and_corrupt_files(tmp_path):
+    """A missing or foreign file is treated as no snapshot"""
+    store = SnapshotStore(str(tmp_path))
+    assert store.get("test", MATCH_DTYPE) is None
+
+    (tmp_path / "test.snap").write_bytes(b"not a snapshot")
+    assert store.get("test", MATCH_DTYPE) is None
+
+
+@pytest.fixture
+def open_data():
+    return {
+        "competitions.json": [
+            {"competition_id": 11, "season_id": 1, "competition_name": "La Liga",
+             "season_name": "2020/2021", "country_name": "Spain"},
+            {"competition_id": 11, "season_id": 2, "competition_name": "La Liga",
+             "season_name": "2021/2022", "country_name": "Spain"},
+        ],
+        "matches/11/1.json": [
+            {"match_id": 10, "match_date": "2020-09-12", "home_team": {"home_team_name": "Team A"},
+             "away_team": {"away_team_name": "Team B"}, "home_score": 2, "away_score": 1},
+            {"match_id": 11, "match_date": "2020-09-19", "home_team": {"home_team_name": "Team B"},
+             "away_team": {"away_team_name": "Team A"}, "home_score": 0, "away_score": 0},
+        ],
+        "matches/11/2.json": [
+            {"match_id": 20, "match_date": "2021-08-14", "home_team": {"home_team_name": "Team C"},
+             "away_team": {"away_team_name": "Team A"}, "home_score": 1, "away_score": 3},
+        ],
+    }
+
+
+def test_new_worker_starts_warm(tmp_path, open_data):
+    """A second service reading the same directory needs no upstream calls"""
+    first = StatsBombService(client=RecordingClient(open_data), snapshots=SnapshotStore(str(tmp_path)))
+    competitions = first.get_competitions()
+    season_one = first.get_matches(11, 1)
+    season_two = first.get_matches(11, 2)
+
+    second = StatsBombService(client=FailingClient(), snapshots=SnapshotStore(str(tmp_path)))
+    assert second.get_competitions() == competitions
+    assert second.get_matches(11, 1) == season_one
+    assert second.get_matches(11, 2) == season_two
+    assert second.get_matches(11, 1)[0] == Match(
+        match_id=10, match_date=date(2020, 9, 12), match_round='', home_team="Team A", away_team="Team B",
+        home_score=2, away_score=1, competition_id=11, season_id=1
+    )
+
+
+def test_republishing_a_season_keeps_the_others(tmp_path, open_data, monkeypatch):
+    """Refreshing one season replaces only its rows"""
+    from app.config import settings
+
+    store = SnapshotStore(str(tmp_path))
+    service = StatsBombService(client=RecordingClient(open_data), snapshots=store)
+    service.get_matches(11, 1)
+    service.get_matches(11, 2)
+
+    # Expire the snapshot so the next read of season 1 refreshes it from upstream
+    open_data["matches/11/1.json"] = open_data["matches/11/1.json"][:1]
+    monkeypatch.setattr(settings, "SNAPSHOT_TTL", 0)
+    assert [m.match_id for m in service.get_matches(11, 1)] == [10]
+
+    snapshot = store.get(MATCHES_SNAPSHOT, MATCH_DTYPE)
+    assert snapshot.version == 3
+    assert snapshot.rows['match_id'].tolist() == [10, 20]
+
+
+def test_snapshot_served_when_upstream_degraded(tmp_path, open_data, monkeypatch):
+    """An expired snapshot is still served if upstream cannot be reached"""
+    from app.config import settings
+
+    StatsBombService(client=RecordingClient(open_data), snapshots=SnapshotStore(str(tmp_path))).get_matches(11, 1)
+    monkeypatch.setattr(settings, "SNAPSHOT_TTL", 0)
+
+    service = StatsBombService(client=FailingClient(), snapshots=SnapshotStore(str(tmp_path)))
+    assert [m.match_id for m in service.get_matches(11, 1)] == [10, 11]
+    with pytest.raises(UpstreamUnavailable):
+        service.get_matches(11, 2)
@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import teams
+from app.main import app
+from app.services.snapshot import SnapshotStore
+from app.services.statsbomb import StatsBombService
+from tests.upstream_stubs import RecordingClient
+
+client = TestClient(app)
+
+
+def match(match_id, match_date, home, away, home_score, away_score):
+    return {
+        "match_id": match_id, "match_date": match_date,
+        "home_team": {"home_team_name": home}, "away_team": {"away_team_name": away},
+        "home_score": home_score, "away_score": away_score,
+    }
+
+
+@pytest.fixture
+def team_service(tmp_path, monkeypatch):
+    """Service whose match snapshot holds two cached seasons"""
+    documents = {
+        # Season 2 is listed first and out of date order to check chronological ranking
+        "matches/11/2.json": [
+            match(20, "2021-08-21", "Team A", "Team C", 0, 1),
+            match(21, "2021-08-14", "Team B", "Team A", 2, 2),
+        ],
+        "matches/11/1.json": [
+            match(10, "2020-09-12", "Team A", "Team B", 2, 1),
+            match(11, "2020-09-19", "Team C", "Team A", 0, 3),
+            match(12, "2020-09-26", "Team B", "Team C", 1, 0),
+            match(13, "2020-10-03", "Team B", "Team A", 1, 0),
+        ],
+    }
+    service = StatsBombService(client=RecordingClient(documents), snapshots=SnapshotStore(str(tmp_path)))
+    service.get_matches(11, 2)
+    service.get_matches(11, 1)
+    monkeypatch.setattr(teams, "statsbomb_service", service)
+    return service
+
+
+def test_get_teams(team_service):
+    """Teams from every cached season are listed"""
+    response = client.get("/api/teams/")
+    assert response.status_code == 200
+    assert response.json() == ["Team A", "Team B", "Team C"]
+
+
+def test_get_teams_without_cached_seasons(tmp_path, monkeypatch):
+    """No cached seasons means no teams rather than an error"""
+    monkeypatch.setattr(teams, "statsbomb_service", StatsBombService(snapshots=SnapshotStore(str(tmp_path))))
+    response = client.get("/api/teams/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_head_to_head(team_service):
+    """Head-to-head spans seasons and lists matches oldest first"""
+    response = client.get("/api/teams/head-to-head?team_a=Team A&team_b=Team B")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["played"] == 3
+    assert data["team_a_wins"] == 1
+    assert data["team_b_wins"] == 1
+    assert data["draws"] == 1
+    assert data["team_a_goals"] == 4
+    assert data["team_b_goals"] == 4
+    assert [m["match_id"] for m in data["matches"]] == [10, 13, 21]
+
+
+def test_head_to_head_season_filter(team_service):
+    """Filters restrict the record to one season"""
+    response = client.get("/api/teams/head-to-head?team_a=Team A&team_b=Team B&season_id=2")
+    assert response.status_code == 200
+    assert [m["match_id"] for m in response.json()["matches"]] == [21]
+
+
+def test_head_to_head_unknown_team(team_service):
+    """Unknown teams are reported as 404"""
+    response = client.get("/api/teams/head-to-head?team_a=Team A&team_b=Team Z")
+    assert response.status_code == 404
+    assert "Team Z" in response.json()["detail"]
+
+
+def test_head_to_head_same_team(team_service):
+    """A team cannot be compared with itself"""
+    response = client.get("/api/teams/head-to-head?team_a=Team A&team_b=Team A")
+    assert response.status_code == 400
+
+    pairs = [{"team_a": "Team A", "team_b": "Team B"}, {"team_a": "Team C", "team_b": "Team C"}]
+    response = client.post("/api/teams/head-to-head", json={"pairs": pairs})
+    assert response.status_code == 400
+    assert "Team C" in response.json()["detail"]
+
+
+def test_head_to_head_batch(team_service):
+    """Many pairs are answered in one request, in request order"""
+    pairs = [
+        {"team_a": "Team A", "team_b": "Team B"},
+        {"team_a": "Team C", "team_b": "Team A"},
+        {"team_a": "Team B", "team_b": "Team C"},
+    ] * 500
+    response = client.post("/api/teams/head-to-head", json={"pairs": pairs})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert len(data) == 1500
+    assert data[1] == {
+        "team_a": "Team C", "team_b": "Team A", "played": 2, "team_a_wins": 1, "team_b_wins": 1,
+        "draws": 0, "team_a_goals": 1, "team_b_goals": 3,
+    }
+    assert data[2]["played"] == 1
+    assert data[2]["team_a_wins"] == 1
+
+
+def test_team_form(team_service):
+    """Rolling totals cover the window of preceding matches"""
+    response = client.get("/api/teams/Team A/form?window=2")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["team"] == "Team A"
+    assert [m["match_id"] for m in data["matches"]] == [10, 11, 13, 21, 20]
+    assert [m["result"] for m in data["matches"]] == ["W", "W", "L", "D", "L"]
+    assert [m["rolling_points"] for m in data["matches"]] == [3, 6, 3, 1, 1]
+    assert [m["rolling_goals_for"] for m in data["matches"]] == [2, 5, 3, 2, 2]
+    assert data["matches"][1]["opponent"] == "Team C"
+    assert data["matches"][1]["home"] is False
+
+
+def test_team_form_limit_keeps_rolling_totals(team_service):
+    """Limiting the output does not shorten the rolling window"""
+    response = client.get("/api/teams/Team A/form?window=2&limit=2")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [m["match_id"] for m in data["matches"]] == [21, 20]
+    assert [m["rolling_points"] for m in data["matches"]] == [1, 1]
+
+
+def test_team_form_unknown_team(team_service):
+    """Form for an unknown team is a 404"""
+    response = client.get("/api/teams/Team Z/form")
+    assert response.status_code == 404
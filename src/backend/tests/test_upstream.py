@@ -0,0 +1,269 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.snapshot import SnapshotStore
+from app.services.statsbomb import StatsBombService
+from app.services.upstream import (
+    CircuitBreaker,
+    UpstreamClient,
+    UpstreamNotFound,
+    UpstreamUnavailable,
+)
+
+client = TestClient(app)
+
+
+class StubUpstream:
+    """Local HTTP server whose responses are scripted per path"""
+
+    def __init__(self):
+        self.routes = {}
+        self.hits = {}
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+                stub.client_ports.add(self.client_address[1])
+                responses = stub.routes.get(self.path, [(404, None, 0)])
+                # Each route is a list of (status, body, delay[, mode]); the last one repeats.
+                # mode "truncate" hangs up mid-body, "drip" sends the body a byte at a time
+                index = min(stub.hits[self.path], len(responses)) - 1
+                status, body, delay, *mode = responses[index]
+                mode = mode[0] if mode else None
+                if delay:
+                    time.sleep(delay)
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if mode == "truncate":
+                    # Promise more bytes than are sent, then hang up
+                    self.send_header("Content-Length", str(len(payload) + 100))
+                    self.close_connection = True
+                else:
+                    self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if mode == "drip":
+                    try:
+                        for i in range(len(payload)):
+                            self.wfile.write(payload[i:i + 1])
+                            self.wfile.flush()
+                            time.sleep(0.1)
+                    except OSError:
+                        self.close_connection = True
+                else:
+                    self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def route(self, path, *responses):
+        self.routes[path] = list(responses)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubUpstream()
+    yield server
+    server.close()
+
+
+def make_client(stub, **overrides):
+    options = dict(
+        base_url=stub.url,
+        connect_timeout=1.0,
+        read_timeout=0.5,
+        total_timeout=2.0,
+        max_retries=2,
+        backoff_base=0.01,
+        backoff_max=0.05,
+        breaker=CircuitBreaker(failure_threshold=5, reset_timeout=60),
+    )
+    options.update(overrides)
+    return UpstreamClient(**options)
+
+
+def test_get_json_reuses_pooled_connection(stub):
+    """Sequential requests go over a single keep-alive connection"""
+    stub.route("/a.json", (200, {"a": 1}, 0))
+    stub.route("/b.json", (200, {"b": 2}, 0))
+    upstream = make_client(stub)
+
+    assert upstream.get_json("a.json") == {"a": 1}
+    assert upstream.get_json("b.json") == {"b": 2}
+    assert upstream.get_json("b.json") == {"b": 2}
+    assert len(stub.client_ports) == 1
+
+
+def test_get_json_retries_transient_errors(stub):
+    """5xx responses are retried until a success arrives"""
+    stub.route("/a.json", (503, None, 0), (502, None, 0), (200, {"ok": True}, 0))
+    upstream = make_client(stub)
+
+    assert upstream.get_json("a.json") == {"ok": True}
+    assert stub.hits["/a.json"] == 3
+
+
+def test_retried_call_is_one_breaker_failure(stub):
+    """Retries within one call count once towards opening the circuit"""
+    stub.route("/a.json", (500, None, 0))
+    upstream = make_client(stub, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("a.json")
+    assert stub.hits["/a.json"] == 3
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("a.json")
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+
+def test_get_json_retries_truncated_body(stub):
+    """A body cut short by the server is treated as a transient failure"""
+    stub.route("/a.json", (200, {"partial": True}, 0, "truncate"), (200, {"ok": True}, 0))
+    upstream = make_client(stub)
+
+    assert upstream.get_json("a.json") == {"ok": True}
+    assert stub.hits["/a.json"] == 2
+
+
+def test_truncated_probe_reopens_circuit(stub):
+    """A half-open probe that fails mid-body re-opens the circuit instead of wedging it"""
+    stub.route("/a.json", (200, {"partial": True}, 0, "truncate"), (200, {"ok": True}, 0))
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    upstream = make_client(stub, max_retries=0, breaker=breaker)
+    breaker.record_failure()
+    time.sleep(0.25)
+
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("a.json")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.25)
+    assert upstream.get_json("a.json") == {"ok": True}
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_get_json_not_found_is_not_retried(stub):
+    """A 404 raises UpstreamNotFound straight away"""
+    upstream = make_client(stub)
+
+    with pytest.raises(UpstreamNotFound):
+        upstream.get_json("missing.json")
+    assert stub.hits["/missing.json"] == 1
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_get_json_slow_upstream_is_bounded(stub):
+    """A slow host is cut off by the read timeout and overall deadline"""
+    stub.route("/slow.json", (200, {}, 1.5))
+    upstream = make_client(stub, read_timeout=0.2, total_timeout=0.5)
+
+    started = time.monotonic()
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("slow.json")
+    assert time.monotonic() - started < 1.0
+
+
+def test_get_json_slow_body_is_bounded(stub):
+    """A host trickling the body is cut off at the overall deadline"""
+    stub.route("/drip.json", (200, {"data": "x" * 50}, 0, "drip"))
+    upstream = make_client(stub, read_timeout=1.0, total_timeout=1.0)
+
+    started = time.monotonic()
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("drip.json")
+    # At most one read timeout past the deadline, not the ~6s the body takes
+    assert time.monotonic() - started < 2.0
+
+
+def test_open_circuit_does_not_call_upstream(stub):
+    """Once the circuit is open, calls fail fast without touching the network"""
+    stub.route("/a.json", (500, None, 0))
+    upstream = make_client(
+        stub,
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+
+    for _ in range(2):
+        with pytest.raises(UpstreamUnavailable):
+            upstream.get_json("a.json")
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    hits = stub.hits["/a.json"]
+    with pytest.raises(UpstreamUnavailable):
+        upstream.get_json("a.json")
+    assert stub.hits["/a.json"] == hits
+
+
+def test_circuit_half_open_probe_closes_circuit():
+    """A successful probe after the reset timeout closes the circuit"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    # Only a single probe is allowed while half-open
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_service_match_detail_against_stub(stub, tmp_path):
+    """StatsBombService builds a MatchDetail from the stubbed open data"""
+    stub.route("/competitions.json", (200, [
+        {"competition_id": 11, "season_id": 1, "competition_name": "La Liga",
+         "season_name": "2020/2021", "country_name": "Spain"},
+    ], 0))
+    stub.route("/matches/11/1.json", (200, [
+        {"match_id": 42, "match_date": "2020-09-12",
+         "home_team": {"home_team_name": "Team A"}, "away_team": {"away_team_name": "Team B"},
+         "home_score": 2, "away_score": 1,
+         "stadium": {"name": "Stadium"}, "referee": {"name": "Referee"}},
+    ], 0))
+    stub.route("/events/42.json", (200, [{"id": "e1"}, {"id": "e2"}], 0))
+    upstream = make_client(stub)
+    service = StatsBombService(client=upstream, snapshots=SnapshotStore(str(tmp_path)))
+
+    detail = service.get_match_detail(42)
+    assert detail.home_team == "Team A"
+    assert detail.away_team == "Team B"
+    assert detail.stadium == "Stadium"
+    assert detail.events_count == 2
+    assert service.get_match_detail(7) is None
+
+    # The season is read once to publish it to the snapshot and once for stadium/referee
+    assert stub.hits["/matches/11/1.json"] == 2
+
+
+def test_match_detail_upstream_unavailable(monkeypatch):
+    """A degraded upstream surfaces as 503 rather than a 404"""
+    def mock_get_match_detail(self, match_id):
+        raise UpstreamUnavailable("Circuit open")
+
+    monkeypatch.setattr(StatsBombService, "get_match_detail", mock_get_match_detail)
+
+    response = client.get("/api/matches/1")
+    assert response.status_code == 503
@@ -0,0 +1,20 @@
+from app.services.upstream import UpstreamUnavailable
+
+
+class FailingClient:
+    """Upstream client stand-in that is always degraded"""
+
+    def get_json(self, path):
+        raise UpstreamUnavailable("Circuit open")
+
+
+class RecordingClient:
+    """Upstream client stand-in serving fixed open-data documents"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+
+    def get_json(self, path):
+        self.calls.append(path)
+        return self.documents[path]